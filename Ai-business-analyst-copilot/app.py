@@ -1,12 +1,26 @@
+import io
+
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 
-from src.metrics_engine import compute_advanced_metrics
+from src.metrics_engine import compute_advanced_metrics, read_business_csv
 from src.ai_reasoning import summarize_business, generate_executive_summary, answer_business_question
 
 st.set_page_config(page_title="AI Business Analyst Copilot", layout="wide")
 
+
+@st.cache_data(show_spinner=False)
+def load_and_compute(file_bytes: bytes):
+    """
+    Parses the uploaded CSV and computes metrics once per file.
+    Cached on the raw bytes so widget reruns reuse the result.
+    """
+    df = read_business_csv(io.BytesIO(file_bytes))
+    metrics = compute_advanced_metrics(df)
+    summary = summarize_business(metrics)
+    return metrics, summary
+
+
 st.title("AI-Driven Business Analyst Copilot")
 st.markdown("Upload your dataset and get structured business insights")
 
@@ -14,18 +28,17 @@ uploaded_file = st.file_uploader("Upload CSV file", type=["csv"])
 
 if uploaded_file is not None:
 
-    df = pd.read_csv(uploaded_file)
-    metrics = compute_advanced_metrics(df)
-    summary = summarize_business(metrics)
+    file_bytes = uploaded_file.getvalue()
+    metrics, summary = load_and_compute(file_bytes)
 
     st.divider()
 
     st.header("📊 Business Health Overview")
     col1, col2, col3 = st.columns(3)
 
-    col1.metric("Health Score", summary["health_score"])
-    col2.metric("Profit Margin (%)", summary["profit_margin_pct"])
-    col3.metric("Loss Order (%)", summary["loss_order_pct"])
+    col1.metric("Health Score", f"{summary.health_score:.2f}")
+    col2.metric("Profit Margin (%)", f"{summary.profit_margin_pct:.2f}")
+    col3.metric("Loss Order (%)", f"{summary.loss_order_pct:.2f}")
 
     st.divider()
 
@@ -37,7 +50,7 @@ if uploaded_file is not None:
     ineff = metrics["structural_inefficiency_by_category"]
 
     fig = px.bar(
-        ineff,
+        ineff.reset_index(),
         x="category",
         y="avg_loss_ratio",
         title="Average Loss Ratio by Category"
@@ -51,9 +64,9 @@ if uploaded_file is not None:
     st.divider()
 
     st.subheader("Risk Analysis")
-    st.write(f"Highest Risk Category: **{summary['highest_risk_category']}**")
-    st.write(f"Loss Ratio: **{summary['highest_loss_ratio']}%**")
-    st.write(f"Risk Level: **{summary['risk_level']}**")
+    st.write(f"Highest Risk Category: **{summary.highest_risk_category}**")
+    st.write(f"Loss Ratio: **{summary.highest_loss_ratio:.2f}%**")
+    st.write(f"Risk Level: **{summary.risk_level}**")
 
     st.subheader("🧠 Executive Summary")
     st.info(generate_executive_summary(summary))
@@ -63,6 +76,6 @@ if uploaded_file is not None:
     user_question = st.text_input("Type your question")
 
     if user_question:
-        answer = answer_business_question(user_question, metrics)
+        answer = answer_business_question(user_question, metrics, summary)
         st.write("### 💬 Answer:")
         st.write(answer)
@@ -1,6 +1,38 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict
 
-def summarize_business(metrics: Dict) -> Dict:
+# Q&A intent keywords, compiled into one pattern so a question is scanned once
+_INTENT_KEYWORDS = {
+    "health": ["health", "overall score", "business condition"],
+    "margin": ["margin", "profit margin"],
+    "loss_orders": ["loss order", "loss orders", "loss percentage", "how many loss"],
+    "risk_category": ["highest risk", "risk category", "most risky"],
+    "stability": ["stable", "stability", "volatility", "unstable"],
+    "risk": ["risk"],
+}
+
+_INTENT_RE = re.compile("|".join(
+    f"(?P<{intent}>{'|'.join(map(re.escape, words))})"
+    for intent, words in _INTENT_KEYWORDS.items()
+))
+
+
+@dataclass(slots=True, frozen=True)
+class BusinessSummary:
+    """
+    Structured decision signals extracted from the metrics.
+    """
+    health_score: float
+    profit_margin_pct: float
+    loss_order_pct: float
+    highest_risk_category: str
+    highest_loss_ratio: float
+    risk_level: str
+
+
+def summarize_business(metrics: Dict) -> BusinessSummary:
     """
     Extracts structured decision signals from metrics.
     """
@@ -13,9 +45,8 @@ def summarize_business(metrics: Dict) -> Dict:
     collapse_risk = collapse["loss_consistency_ratio"].max()
 
     #  Highest inefficiency category
-    highest_risk_row = inefficiency.iloc[0]
-    highest_risk_category = highest_risk_row["category"]
-    highest_loss_ratio = highest_risk_row["avg_loss_ratio"]
+    highest_risk_category = inefficiency["avg_loss_ratio"].idxmax()
+    highest_loss_ratio = inefficiency.at[highest_risk_category, "avg_loss_ratio"]
 
     #  Determine risk level
     if collapse_risk > 0:
@@ -27,33 +58,35 @@ def summarize_business(metrics: Dict) -> Dict:
     else:
         risk_level = "Low"
 
-    summary = {
-        "health_score": health["health_score"],
-        "profit_margin_pct": health["profit_margin_pct"],
-        "loss_order_pct": health["loss_order_pct"],
-        "highest_risk_category": highest_risk_category,
-        "highest_loss_ratio": round(highest_loss_ratio * 100, 2),
-        "risk_level": risk_level
-    }
-
-    return summary
-def generate_executive_summary(summary: Dict) -> str:
+    return BusinessSummary(
+        health_score=float(health["health_score"]),
+        profit_margin_pct=float(health["profit_margin_pct"]),
+        loss_order_pct=float(health["loss_order_pct"]),
+        highest_risk_category=str(highest_risk_category),
+        highest_loss_ratio=float(highest_loss_ratio * 100),
+        risk_level=risk_level
+    )
+
+
+@lru_cache(maxsize=32)
+def generate_executive_summary(summary: BusinessSummary) -> str:
     """
     Converts structured summary into executive-ready explanation.
-    Deterministic — no hallucination.
+    Deterministic — no hallucination, so results are memoized
+    on the (frozen, hashable) summary.
     """
 
     explanation = f"""
-Business Health Score: {summary['health_score']}/100.
+Business Health Score: {summary.health_score:.2f}/100.
 
-Overall profit margin stands at {summary['profit_margin_pct']}%.
-However, {summary['loss_order_pct']}% of orders are loss-making.
+Overall profit margin stands at {summary.profit_margin_pct:.2f}%.
+However, {summary.loss_order_pct:.2f}% of orders are loss-making.
 
 The highest structural inefficiency is observed in the 
-{summary['highest_risk_category']} category, where approximately 
-{summary['highest_loss_ratio']}% of orders consistently generate losses.
+{summary.highest_risk_category} category, where approximately 
+{summary.highest_loss_ratio:.2f}% of orders consistently generate losses.
 
-Risk Classification: {summary['risk_level']}.
+Risk Classification: {summary.risk_level}.
 
 Although aggregate profitability remains positive, 
 margin concentration and pricing inefficiencies increase volatility risk. 
@@ -62,47 +95,53 @@ Strategic review of discounting, cost structure, and customer segmentation is re
 
     return explanation.strip()
 
-def answer_business_question(question: str, metrics: Dict) -> str:
+def answer_business_question(
+    question: str,
+    metrics: Dict,
+    summary: BusinessSummary
+) -> str:
     """
     Deterministic business Q&A engine.
     Routes question to appropriate metric using intent clustering.
+    Takes the summary computed once per upload instead of rebuilding it.
     """
 
     q = question.lower().strip()
-    summary = summarize_business(metrics)
+    intents = {match.lastgroup for match in _INTENT_RE.finditer(q)}
 
     # --- Health Intent ---
-    if any(word in q for word in ["health", "overall score", "business condition"]):
-        return f"The overall business health score is {summary['health_score']}/100."
+    if "health" in intents:
+        return f"The overall business health score is {summary.health_score:.2f}/100."
 
     # --- Profit Margin Intent ---
-    elif any(word in q for word in ["margin", "profit margin"]):
-        return f"The current profit margin is {summary['profit_margin_pct']}%."
+    elif "margin" in intents:
+        return f"The current profit margin is {summary.profit_margin_pct:.2f}%."
 
     # --- Loss Order Intent ---
-    elif any(word in q for word in ["loss order", "loss orders", "loss percentage", "how many loss"]):
-        return f"{summary['loss_order_pct']}% of total orders are loss-making."
+    elif "loss_orders" in intents:
+        return f"{summary.loss_order_pct:.2f}% of total orders are loss-making."
 
     # --- Risk Category Intent ---
-    elif any(word in q for word in ["highest risk", "risk category", "most risky"]):
+    elif "risk_category" in intents:
         return (
             f"The category with highest structural inefficiency is "
-            f"{summary['highest_risk_category']} "
-            f"with approximately {summary['highest_loss_ratio']}% "
+            f"{summary.highest_risk_category} "
+            f"with approximately {summary.highest_loss_ratio:.2f}% "
             f"loss-making orders."
         )
 
     # --- Stability / Volatility Intent ---
-    elif any(word in q for word in ["stable", "stability", "volatility", "unstable"]):
-        worst = metrics["structural_inefficiency_by_category"].iloc[0]
+    elif "stability" in intents:
+        inefficiency = metrics["structural_inefficiency_by_category"]
+        worst = inefficiency.loc[inefficiency["avg_loss_ratio"].idxmax()]
         return (
-            f"{worst['category']} shows {worst['stability']} behavior "
-            f"with an average loss ratio of {round(worst['avg_loss_ratio'] * 100, 2)}%."
+            f"{worst.name} shows {worst['stability']} behavior "
+            f"with an average loss ratio of {worst['avg_loss_ratio'] * 100:.2f}%."
         )
 
     # --- Risk Level Intent ---
-    elif "risk" in q:
-        return f"Risk classification is: {summary['risk_level']}."
+    elif "risk" in intents:
+        return f"Risk classification is: {summary.risk_level}."
 
     else:
         return (
@@ -1,16 +1,153 @@
+import re
+from typing import Optional
+
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Only these (normalized) columns are used by the metrics below
+REQUIRED_COLS = [
+    "sales", "profit", "order_id", "discount",
+    "category", "sub_category", "region", "segment", "year",
+]
+
+# Read only when the file has no year column; year is derived from it
+DATE_COL = "order_date"
+
+# Dimensions reported in the profit breakdowns and worst performers
+BREAKDOWN_DIMS = ["category", "sub_category", "region", "segment"]
+
+DTYPES = {
+    "sales": "float32",
+    "profit": "float32",
+    "discount": "float32",
+    "category": "category",
+    "sub_category": "category",
+    "region": "category",
+    "segment": "category",
+}
+
+# Money totals always accumulate in float64, whatever the storage dtype
+_AMOUNT_COLS = ["sales", "profit"]
+
+_COL_RE = re.compile(r"[^\w]+")
 
 # ---------------------------
 # Column normalization
 # ---------------------------
+def _clean_column(name: str) -> str:
+    return _COL_RE.sub("_", str(name).strip().lower())
+
+
 def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df.columns = (
-        df.columns
-        .str.strip()
-        .str.lower()
-        .str.replace(r"[^\w]+", "_", regex=True)
+    # Shallow copy: new column labels, data buffers stay shared
+    df = df.copy(deep=False)
+    df.columns = [_clean_column(c) for c in df.columns]
+    return df
+
+
+def _loss_mask(df: pd.DataFrame) -> pd.Series:
+    # Reuse the flag precomputed by compute_advanced_metrics when present
+    if "is_loss" in df.columns:
+        return df["is_loss"]
+    return df["profit"] < 0
+
+
+def _median(values: np.ndarray) -> float:
+    # Selection via np.partition (O(n)); skips NaN like Series.median
+    values = values[~np.isnan(values)]
+    n = values.size
+    if n == 0:
+        return np.nan
+
+    mid = n // 2
+    if n % 2:
+        return float(np.partition(values, mid)[mid])
+
+    part = np.partition(values, [mid - 1, mid])
+    return (float(part[mid - 1]) + float(part[mid])) / 2
+
+
+def _amounts64(df: pd.DataFrame) -> pd.DataFrame:
+    return df[_AMOUNT_COLS].astype(np.float64)
+
+
+def _ensure_year(df: pd.DataFrame) -> None:
+    # Parse the order date once, then keep year as a compact int16 key
+    if "year" not in df.columns and DATE_COL in df.columns:
+        dates = pd.to_datetime(df[DATE_COL], cache=True)
+        df["year"] = dates.dt.year.astype("int16")
+    elif "year" in df.columns and pd.api.types.is_integer_dtype(df["year"]):
+        df["year"] = df["year"].astype("int16")
+
+
+def _group_sums(
+    codes: np.ndarray,
+    n_groups: int,
+    values: Optional[np.ndarray] = None
+) -> np.ndarray:
+    # Per-code sums (or counts); code -1 marks a missing key and is dropped
+    return np.bincount(codes + 1, weights=values, minlength=n_groups + 1)[1:]
+
+
+def _order_col(df: pd.DataFrame) -> str:
+    # Categorical order codes hash far cheaper than string IDs in nunique
+    return "order_code" if "order_code" in df.columns else "order_id"
+
+
+def _order_codes(df: pd.DataFrame) -> tuple:
+    """
+    Integer code per row for its order, -1 where the order ID is missing,
+    plus the size of the code space. Reuses the categorical order_code
+    codes as-is, so missing IDs are never re-coded as a real order.
+    """
+    orders = df[_order_col(df)]
+    if isinstance(orders.dtype, pd.CategoricalDtype):
+        return orders.cat.codes.to_numpy(), len(orders.cat.categories)
+
+    codes, uniques = pd.factorize(orders, sort=False)
+    return codes, len(uniques)
+
+
+# ---------------------------
+# Data loading
+# ---------------------------
+def read_business_csv(source, chunksize: Optional[int] = None) -> pd.DataFrame:
+    """
+    Reads only REQUIRED_COLS with compact dtypes and returns a frame
+    with normalized column names. With chunksize set, the file is
+    streamed and pruned chunk by chunk before being combined.
+    """
+    header = pd.read_csv(source, nrows=0).columns
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+    names = {raw: _clean_column(raw) for raw in header}
+    wanted = set(REQUIRED_COLS)
+    if "year" not in names.values():
+        wanted.add(DATE_COL)
+    names = {raw: name for raw, name in names.items() if name in wanted}
+
+    read_kwargs = dict(
+        usecols=list(names),
+        dtype={raw: DTYPES[name] for raw, name in names.items() if name in DTYPES},
+        parse_dates=[raw for raw, name in names.items() if name == DATE_COL],
     )
+
+    if chunksize is None:
+        df = pd.read_csv(source, **read_kwargs)
+    else:
+        chunks = list(pd.read_csv(source, chunksize=chunksize, **read_kwargs))
+        df = pd.concat(chunks, ignore_index=True)
+
+        # Chunks carry different category sets; concat falls back to object
+        for col in df.columns:
+            if isinstance(chunks[0][col].dtype, pd.CategoricalDtype):
+                df[col] = union_categoricals(
+                    [chunk[col] for chunk in chunks], sort_categories=True
+                )
+
+    df.columns = [names[raw] for raw in df.columns]
     return df
 
 
@@ -18,22 +155,28 @@ def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
 # Day 2 – Core KPIs
 # ---------------------------
 def compute_kpis(df: pd.DataFrame) -> dict:
-    df = normalize_columns(df)
-
-    total_revenue = df["sales"].sum()
-    total_profit = df["profit"].sum()
+    total_revenue = float(np.nansum(df["sales"].to_numpy(), dtype=np.float64))
+    total_profit = float(np.nansum(df["profit"].to_numpy(), dtype=np.float64))
     profit_margin = (total_profit / total_revenue) * 100
 
-    total_orders = df["order_id"].nunique()
-    loss_orders = df[df["profit"] < 0]["order_id"].nunique()
+    # Distinct orders, and orders with at least one loss line, from one
+    # set of order codes; missing IDs (code -1) are dropped by _group_sums
+    order_codes, n_orders = _order_codes(df)
+    order_lines = _group_sums(order_codes, n_orders)
+    loss_lines = _group_sums(
+        order_codes, n_orders, _loss_mask(df).to_numpy(dtype=np.float64)
+    )
+
+    total_orders = int(np.count_nonzero(order_lines))
+    loss_orders = int(np.count_nonzero(loss_lines))
     loss_order_pct = (loss_orders / total_orders) * 100
 
     return {
-        "total_revenue": round(total_revenue, 2),
-        "total_profit": round(total_profit, 2),
-        "profit_margin_pct": round(profit_margin, 2),
+        "total_revenue": total_revenue,
+        "total_profit": total_profit,
+        "profit_margin_pct": profit_margin,
         "total_orders": total_orders,
-        "loss_order_pct": round(loss_order_pct, 2)
+        "loss_order_pct": loss_order_pct
     }
 
 
@@ -41,31 +184,50 @@ def compute_kpis(df: pd.DataFrame) -> dict:
 # Day 3 – Helper functions
 # ---------------------------
 def profit_by_dimension(df: pd.DataFrame, column: str) -> pd.DataFrame:
-    if column not in df.columns:
-        raise ValueError(f"Column '{column}' not found in dataframe")
+    return _profit_breakdowns(df, [column])[column]
 
-    summary = (
-        df.groupby(column)
-        .agg(
-            total_sales=("sales", "sum"),
-            total_profit=("profit", "sum")
+
+def worst_performers(df: pd.DataFrame) -> dict:
+    return _worst_from_breakdowns(_profit_breakdowns(df, BREAKDOWN_DIMS))
+
+
+def _profit_breakdowns(df: pd.DataFrame, dimensions: list) -> dict:
+    """
+    Profit breakdowns for several dimensions from a single float64 read
+    of sales and profit, summed per factorized key with np.bincount.
+    """
+    for column in dimensions:
+        if column not in df.columns:
+            raise ValueError(f"Column '{column}' not found in dataframe")
+
+    sales = df["sales"].to_numpy(dtype=np.float64, na_value=0.0)
+    profit = df["profit"].to_numpy(dtype=np.float64, na_value=0.0)
+
+    breakdowns = {}
+    for column in dimensions:
+        codes, keys = pd.factorize(df[column], sort=False)
+
+        summary = pd.DataFrame(
+            {
+                "total_sales": _group_sums(codes, len(keys), sales),
+                "total_profit": _group_sums(codes, len(keys), profit),
+            },
+            index=pd.Index(keys, name=column)
         )
-        .reset_index()
-    )
 
-    summary["profit_margin_pct"] = (
-        summary["total_profit"] / summary["total_sales"] * 100
-    )
+        summary["profit_margin_pct"] = (
+            summary["total_profit"] / summary["total_sales"] * 100
+        )
 
-    return summary.sort_values("total_profit")
+        breakdowns[column] = summary.sort_values("total_profit")
 
+    return breakdowns
 
-def worst_performers(df: pd.DataFrame) -> dict:
+
+def _worst_from_breakdowns(breakdowns: dict) -> dict:
     return {
-        "worst_category": profit_by_dimension(df, "category").iloc[0]["category"],
-        "worst_sub_category": profit_by_dimension(df, "sub_category").iloc[0]["sub_category"],
-        "worst_region": profit_by_dimension(df, "region").iloc[0]["region"],
-        "worst_segment": profit_by_dimension(df, "segment").iloc[0]["segment"],
+        f"worst_{dimension}": summary["total_profit"].idxmin()
+        for dimension, summary in breakdowns.items()
     }
 
 
@@ -73,17 +235,23 @@ def discount_profit_analysis(df: pd.DataFrame) -> pd.DataFrame:
     bins = [-0.01, 0.10, 0.20, 0.30, 1.0]
     labels = ["0-10%", "10-20%", "20-30%", "30%+"]
 
-    df = df.copy()
-    df["discount_bucket"] = pd.cut(df["discount"], bins=bins, labels=labels)
+    # Bins in the column's own dtype so a float32 0.10 still lands in 0-10%
+    discount = df["discount"]
+    bins = np.asarray(bins, dtype=discount.dtype if discount.dtype.kind == "f" else None)
+
+    # Bucket series is the groupby key directly; no copy of the frame
+    discount_bucket = pd.cut(discount, bins=bins, labels=labels).rename("discount_bucket")
 
     summary = (
-        df.groupby("discount_bucket")
+        _amounts64(df)
+        .groupby(discount_bucket, observed=True)
         .agg(
             total_sales=("sales", "sum"),
-            total_profit=("profit", "sum"),
-            order_count=("order_id", "nunique")
+            total_profit=("profit", "sum")
         )
-        .reset_index()
+    )
+    summary["order_count"] = (
+        df.groupby(discount_bucket, observed=True)[_order_col(df)].nunique()
     )
 
     summary["profit_margin_pct"] = (
@@ -94,37 +262,46 @@ def discount_profit_analysis(df: pd.DataFrame) -> pd.DataFrame:
 
 
 def high_sales_negative_profit(df: pd.DataFrame) -> pd.DataFrame:
-    df = normalize_columns(df)
+    sales = df["sales"].to_numpy()
+    sales_threshold = _median(sales)
 
-    sales_threshold = df["sales"].median()
+    mask = np.logical_and(sales > sales_threshold, _loss_mask(df).to_numpy())
 
-    return df[
-        (df["sales"] > sales_threshold) &
-        (df["profit"] < 0)
-    ][["order_id", "sales", "profit", "discount", "category", "sub_category"]]
+    return df.loc[
+        mask,
+        ["order_id", "sales", "profit", "discount", "category", "sub_category"]
+    ]
 
 
 # ---------------------------
 # Day 3 – Main aggregator
 # ---------------------------
 def compute_advanced_metrics(df: pd.DataFrame) -> dict:
+    # Normalize once here; every helper below expects normalized columns
     df = normalize_columns(df)
+    _ensure_year(df)
+    df["is_loss"] = df["profit"].to_numpy() < 0
+    # Categorical codes keep a missing order_id missing (not a -1 "order")
+    df["order_code"] = df["order_id"].astype("category")
     metrics = {}
 
+    # One (category, year) pass shared by the category validation layer
+    category_cube = _dimension_time_cube(df, "category")
+
 # --- Core breakdowns ---
-    metrics["profit_by_category"] = profit_by_dimension(df, "category")
-    metrics["profit_by_sub_category"] = profit_by_dimension(df, "sub_category")
-    metrics["profit_by_region"] = profit_by_dimension(df, "region")
-    metrics["profit_by_segment"] = profit_by_dimension(df, "segment")
+    # All four breakdowns in one pass, shared with the worst performers
+    breakdowns = _profit_breakdowns(df, BREAKDOWN_DIMS)
+    for dimension, summary in breakdowns.items():
+        metrics[f"profit_by_{dimension}"] = summary
 
 # --- Diagnostic insights ---
-    metrics["worst_performers"] = worst_performers(df)
+    metrics["worst_performers"] = _worst_from_breakdowns(breakdowns)
     metrics["discount_analysis"] = discount_profit_analysis(df)
     metrics["high_sales_negative_profit"] = high_sales_negative_profit(df)
 
 # --- Validation layer (Day 4) ---
-    metrics["structural_collapse_by_category"] = consistency_analysis(df, "category")
-    metrics["structural_inefficiency_by_category"] = order_loss_consistency(df, "category")
+    metrics["structural_collapse_by_category"] = _collapse_from_cube(category_cube, "category")
+    metrics["structural_inefficiency_by_category"] = _inefficiency_from_cube(category_cube, "category")
 
 # --- Executive scoring ---
     metrics["business_health"] = profit_health_score(df)
@@ -132,36 +309,18 @@ def compute_advanced_metrics(df: pd.DataFrame) -> dict:
     return metrics
 
 
+def compute_advanced_metrics_chunked(path, chunksize: int = 1_000_000) -> dict:
+    """
+    Variant for large files: streams the CSV in pruned, typed chunks so
+    only REQUIRED_COLS are ever held in memory.
+    """
+    return compute_advanced_metrics(read_business_csv(path, chunksize=chunksize))
 
-def consistency_analysis(df: pd.DataFrame, dimension: str, time_col: str = "year") -> pd.DataFrame:
-    df = normalize_columns(df)
-
-    if dimension not in df.columns or time_col not in df.columns:
-        raise ValueError("Invalid dimension or time column")
-
-    summary = (
-        df.groupby([dimension, time_col])
-        .agg(total_profit=("profit", "sum"))
-        .reset_index()
-    )
-
-    summary["is_loss"] = summary["total_profit"] < 0
 
-    consistency = (
-        summary.groupby(dimension)
-        .agg(
-            loss_periods=("is_loss", "sum"),
-            total_periods=(time_col, "nunique"),
-            avg_profit=("total_profit", "mean")
-        )
-        .reset_index()
-    )
-
-    consistency["loss_consistency_ratio"] = (
-        consistency["loss_periods"] / consistency["total_periods"]
-    )
 
-    return consistency.sort_values("loss_consistency_ratio", ascending=False)
+def consistency_analysis(df: pd.DataFrame, dimension: str, time_col: str = "year") -> pd.DataFrame:
+    cube = _dimension_time_cube(df, dimension, time_col)
+    return _collapse_from_cube(cube, dimension, time_col)
 
 
 def profit_health_score(df: pd.DataFrame) -> dict:
@@ -174,7 +333,7 @@ def profit_health_score(df: pd.DataFrame) -> dict:
     score -= max(0, kpis["loss_order_pct"] - 15) * 1.5
 
     return {
-        "health_score": round(max(score, 0), 2),
+        "health_score": max(score, 0),
         "profit_margin_pct": kpis["profit_margin_pct"],
         "loss_order_pct": kpis["loss_order_pct"]
     }
@@ -186,45 +345,112 @@ def order_loss_consistency(
     time_col: str = "year"
 ) -> pd.DataFrame:
 
-    df = normalize_columns(df)
+    cube = _dimension_time_cube(df, dimension, time_col)
+    return _inefficiency_from_cube(cube, dimension, time_col)
 
-    summary = (
-        df.groupby([dimension, time_col])
+
+# ---------------------------
+# Day 4 – Shared dimension x time cube
+# ---------------------------
+def _dimension_time_cube(
+    df: pd.DataFrame,
+    dimension: str,
+    time_col: str = "year"
+) -> pd.DataFrame:
+    """
+    Single pass over the rows producing per (dimension, period)
+    profit, distinct orders and loss-making line items.
+    The validation breakdowns below are rolled up from this cube.
+    """
+    if dimension not in df.columns or time_col not in df.columns:
+        raise ValueError("Invalid dimension or time column")
+
+    dim_codes, dims = pd.factorize(df[dimension], sort=False)
+    time_codes, periods = pd.factorize(df[time_col], sort=False)
+    order_codes, n_orders = _order_codes(df)
+
+    # Flat (dimension, period) cell per row; -1 where either key is missing
+    n_periods = len(periods)
+    n_cells = len(dims) * n_periods
+    cell = np.where(
+        (dim_codes >= 0) & (time_codes >= 0),
+        dim_codes * n_periods + time_codes,
+        -1
+    )
+
+    rows = _group_sums(cell, n_cells)
+    total_profit = _group_sums(
+        cell, n_cells, df["profit"].to_numpy(dtype=np.float64, na_value=0.0)
+    )
+    loss_orders = _group_sums(cell, n_cells, _loss_mask(df).to_numpy(dtype=np.float64))
+
+    # Distinct orders: hash-dedupe (cell, order) pairs, then count per cell
+    has_order = order_codes >= 0
+    pairs = pd.unique(
+        cell[has_order].astype(np.int64) * n_orders + order_codes[has_order]
+    )
+    total_orders = _group_sums(pairs // n_orders, n_cells)
+
+    # Keep observed cells only, as groupby(observed=True) would
+    idx = np.flatnonzero(rows)
+
+    return pd.DataFrame({
+        dimension: dims.take(idx // n_periods),
+        time_col: periods.take(idx % n_periods),
+        "total_profit": total_profit[idx],
+        "total_orders": total_orders[idx],
+        "loss_orders": loss_orders[idx].astype(np.int64),
+    })
+
+
+def _collapse_from_cube(
+    cube: pd.DataFrame,
+    dimension: str,
+    time_col: str = "year"
+) -> pd.DataFrame:
+
+    consistency = (
+        cube.assign(is_loss=cube["total_profit"] < 0)
+        .groupby(dimension, observed=True)
         .agg(
-            total_orders=("order_id", "nunique"),
-            loss_orders=("profit", lambda x: (x < 0).sum())
+            loss_periods=("is_loss", "sum"),
+            total_periods=(time_col, "nunique"),
+            avg_profit=("total_profit", "mean")
         )
-        .reset_index()
     )
 
-    summary["loss_order_ratio"] = (
-        summary["loss_orders"] / summary["total_orders"]
+    consistency["loss_consistency_ratio"] = (
+        consistency["loss_periods"] / consistency["total_periods"]
     )
 
+    return consistency.sort_values("loss_consistency_ratio", ascending=False)
+
+
+def _inefficiency_from_cube(
+    cube: pd.DataFrame,
+    dimension: str,
+    time_col: str = "year"
+) -> pd.DataFrame:
+
     consistency = (
-        summary.groupby(dimension)
+        cube.assign(loss_order_ratio=cube["loss_orders"] / cube["total_orders"])
+        .groupby(dimension, observed=True)
         .agg(
             avg_loss_ratio=("loss_order_ratio", "mean"),
             std_loss_ratio=("loss_order_ratio", "std"),
             periods_analyzed=(time_col, "nunique")
         )
-        .reset_index()
     )
 
     # Handle NaN std (happens if only 1 period exists)
     consistency["std_loss_ratio"] = consistency["std_loss_ratio"].fillna(0)
 
     # Stability classification
-    consistency["stability"] = consistency["std_loss_ratio"].apply(
-        lambda x: "Stable"
-        if x < 0.05
-        else "Moderate"
-        if x < 0.15
-        else "Unstable"
+    std = consistency["std_loss_ratio"].to_numpy()
+    consistency["stability"] = np.select(
+        [std < 0.05, std < 0.15],
+        ["Stable", "Moderate"],
+        default="Unstable"
     )
 
     return consistency.sort_values("avg_loss_ratio", ascending=False)
-
-
-
-